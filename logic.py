@@ -1,9 +1,27 @@
 # logic.py
 
+import ast
 import json
+import operator
+import os
+import re
 from decimal import Decimal, InvalidOperation
+from functools import lru_cache
 from typing import List, Dict, Tuple
 
+try:
+    import orjson
+
+    _HAS_ORJSON = True
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    _HAS_ORJSON = False
+
+# Parsed people files keyed by path, stored with the mtime they were read at.
+_people_cache: Dict[str, Tuple[int, List[str]]] = {}
+
+# Matches plain numeric literals like "12", "-3.50" that need no evaluation.
+_NUMBER_RE = re.compile(r"^-?\d+(\.\d+)?$")
+
 
 class CalculationError(Exception):
     """Custom exception for calculation errors."""
@@ -11,6 +29,45 @@ class CalculationError(Exception):
     pass
 
 
+# Arithmetic operators allowed in amount expressions.
+_BIN_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+}
+_UNARY_OPS = {
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+
+@lru_cache(maxsize=256)
+def _parse(expression: str) -> ast.expr:
+    """Parses an expression once; repeated inputs reuse the syntax tree."""
+    return ast.parse(expression, mode="eval").body
+
+
+def _eval_node(node: ast.expr) -> Decimal:
+    """
+    Evaluates a parsed expression using Decimal arithmetic.
+    Only numbers and + - * / are allowed; anything else raises CalculationError.
+    """
+    if isinstance(node, ast.Constant):
+        value = node.value
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise CalculationError(f"Unsupported value: {value!r}")
+        number = Decimal(str(value))
+        if not number.is_finite():  # e.g. "1e400" parses as float("inf")
+            raise CalculationError(f"Number out of range: {value!r}")
+        return number
+    if isinstance(node, ast.BinOp) and type(node.op) in _BIN_OPS:
+        return _BIN_OPS[type(node.op)](_eval_node(node.left), _eval_node(node.right))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+        return _UNARY_OPS[type(node.op)](_eval_node(node.operand))
+    raise CalculationError(f"Unsupported syntax: {type(node).__name__}")
+
+
 def safe_decimal_eval(expression: str) -> Decimal:
     """
     Safely evaluates a string expression and returns it as a Decimal.
@@ -18,9 +75,12 @@ def safe_decimal_eval(expression: str) -> Decimal:
     """
     if not expression:
         return Decimal(0)
+    stripped = expression.strip()
+    if _NUMBER_RE.match(stripped):
+        return Decimal(stripped)
     try:
-        # Using eval with limited scope for simple arithmetic (e.g., "15/2")
-        return Decimal(eval(expression, {"__builtins__": None}, {}))
+        # Walk the syntax tree ourselves rather than eval'ing (e.g., "15/2")
+        return _eval_node(_parse(stripped))
     except Exception:
         raise CalculationError(f"Invalid expression: {expression}")
 
@@ -29,9 +89,20 @@ def load_people_from_file(filepath: str) -> List[str]:
     """
     Loads a list of people from a JSON file.
     Raises FileNotFoundError or json.JSONDecodeError on failure.
+    Results are cached until the file's mtime changes.
     """
-    with open(filepath, "r") as f:
-        return json.load(f)
+    mtime = os.stat(filepath).st_mtime_ns
+    cached = _people_cache.get(filepath)
+    if cached is not None and cached[0] == mtime:
+        return list(cached[1])
+
+    with open(filepath, "rb") as f:
+        data = f.read()
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers
+    # handle both parsers the same way.
+    people = orjson.loads(data) if _HAS_ORJSON else json.loads(data)
+    _people_cache[filepath] = (mtime, people)
+    return list(people)
 
 
 def calculate_split_bill(
@@ -47,8 +118,7 @@ def calculate_split_bill(
     Returns:
         A dictionary containing the calculation results.
     """
-    amounts = [amount for _, amount in person_amounts]
-    total = sum(amounts)
+    total = sum(amount for _, amount in person_amounts)
 
     if total == 0:
         if other_charges > 0 and person_amounts:
@@ -64,11 +134,9 @@ def calculate_split_bill(
         else:
             return {}  # Signifies nothing to calculate
 
-    weights = [x / total for x in amounts]
-    final_amounts = []
-    for i, (name, amount) in enumerate(person_amounts):
-        final_amount = amount + other_charges * weights[i]
-        final_amounts.append((name, final_amount))
+    # amount + other_charges * (amount / total) == amount * factor
+    factor = Decimal(1) + other_charges / total
+    final_amounts = [(name, amount * factor) for name, amount in person_amounts]
 
     return {
         "subtotal": total,
@@ -0,0 +1,53 @@
+# test_logic.py
+
+from decimal import Decimal
+
+import pytest
+
+import logic
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ("", Decimal(0)),
+        ("12", Decimal("12")),
+        ("-3.50", Decimal("-3.50")),
+        (" 1+1", Decimal(2)),
+        ("15/2", Decimal("7.5")),
+        ("0.1+0.2", Decimal("0.3")),
+        ("-3*(2+1)", Decimal(-9)),
+        ("+4", Decimal(4)),
+    ],
+)
+def test_safe_decimal_eval_valid(expression, expected):
+    assert logic.safe_decimal_eval(expression) == expected
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "abc",
+        '__import__("os")',
+        "(1).real",
+        "().__class__",
+        "True",
+        '"5"',
+        "2**3",
+        "7//2",
+        "7%2",
+        "1/0",
+        "1e400",
+        "(" * 500 + "1" + ")" * 500,
+    ],
+)
+def test_safe_decimal_eval_rejects(expression):
+    with pytest.raises(logic.CalculationError):
+        logic.safe_decimal_eval(expression)
+
+
+def test_safe_decimal_eval_reuses_parse():
+    logic._parse.cache_clear()
+    logic.safe_decimal_eval("3*4")
+    logic.safe_decimal_eval("3*4")
+    assert logic._parse.cache_info().hits == 1
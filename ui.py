@@ -1,26 +1,35 @@
 # ui.py
 
 import json
-from decimal import Decimal, InvalidOperation
-import subprocess  # Import subprocess for running external commands
-from PIL import Image, ImageOps  # For image handling and preprocessing
-import os  # For file operations
-from PyQt6.QtWidgets import QApplication, QFileDialog  # Replace tkinter imports
-import pytesseract  # For OCR
-import cv2  # OpenCV for advanced image preprocessing
-import numpy as np  # For array manipulations
+from functools import partial
+from pathlib import Path
+from typing import Callable, Iterable
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
 
+from rich.text import Text
 from textual.app import App, ComposeResult
 from textual.containers import Vertical, VerticalScroll, Horizontal
 from textual.screen import ModalScreen
-from textual.widgets import Button, Header, Footer, Input, Static, Label, SelectionList
+from textual.widgets import (
+    Button,
+    DirectoryTree,
+    Header,
+    Footer,
+    Input,
+    Static,
+    Label,
+    SelectionList,
+)
 from textual.widgets.selection_list import Selection
 from textual.message import Message
 from textual.widget import Widget
+from textual.worker import get_current_worker
 
 # Import the business logic functions
 import logic
 
+_CENTS = Decimal("0.01")  # Display precision for amounts
+
 
 # --- NEW WIDGET FOR PERSON INPUT (Unchanged) ---
 class PersonInput(Widget):
@@ -37,6 +46,10 @@ class PersonInput(Widget):
         super().__init__(**kwargs)
         self.person_name = name
         self.input = Input(placeholder="0.00")
+        # Last evaluated input string and its result (or error), reused while unchanged
+        self._cached_str: str | None = None
+        self._cached_val: Decimal = Decimal(0)
+        self._cached_error: logic.CalculationError | None = None
 
     def compose(self) -> ComposeResult:
         with Horizontal():
@@ -51,7 +64,24 @@ class PersonInput(Widget):
 
     @property
     def value(self) -> str:
-        return self.query_one(Input).value
+        return self.input.value
+
+    def evaluate(self) -> Decimal:
+        """
+        Returns the evaluated amount, re-evaluating only if the input changed.
+        Raises CalculationError for invalid expressions, every time it is called.
+        """
+        value = self.value
+        if value != self._cached_str:
+            try:
+                self._cached_val = logic.safe_decimal_eval(value)
+                self._cached_error = None
+            except logic.CalculationError as e:
+                self._cached_error = e
+            self._cached_str = value
+        if self._cached_error is not None:
+            raise logic.CalculationError(*self._cached_error.args)
+        return self._cached_val
 
     def focus_input(self) -> None:
         self.input.focus()
@@ -78,6 +108,47 @@ class SelectPersonScreen(ModalScreen[list[str]]):
             self.dismiss(self.query_one(SelectionList).selected)
 
 
+# --- IMAGE PICKER MODAL ---
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".gif"}
+OCR_MAX_LONG_EDGE = 1600  # Pixels; larger bill images are downscaled before OCR
+
+
+class ImageDirectoryTree(DirectoryTree):
+    """A directory tree that only lists folders and image files."""
+
+    def filter_paths(self, paths: Iterable[Path]) -> Iterable[Path]:
+        return [
+            path
+            for path in paths
+            if not path.name.startswith(".")
+            and (path.is_dir() or path.suffix.lower() in IMAGE_EXTENSIONS)
+        ]
+
+
+class SelectImageScreen(ModalScreen[str | None]):
+    """A modal screen to pick a bill image from the filesystem."""
+
+    def __init__(self, start_path: str = ".") -> None:
+        self.start_path = start_path
+        super().__init__()
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="select_image_dialog"):
+            yield Label("Select Bill Image")
+            yield ImageDirectoryTree(self.start_path)
+            with Vertical(id="dialog_buttons"):
+                yield Button("Cancel", variant="error", id="cancel")
+
+    def on_directory_tree_file_selected(
+        self, event: DirectoryTree.FileSelected
+    ) -> None:
+        self.dismiss(str(event.path))
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "cancel":
+            self.dismiss(None)
+
+
 # --- MAIN APP (Refactored to use logic.py) ---
 class BillSplitterApp(App):
     """A Textual app to split a bill among a variable number of people."""
@@ -90,6 +161,10 @@ class BillSplitterApp(App):
 
     def __init__(self):
         self.all_people = []
+        self._person_widgets: list[PersonInput] = []
+        self._all_people_ordered: list[str] = []
+        self._present: set[str] = set()  # Names currently in the people list
+        self._last_plain_result = ""  # Markup-free copy of the last calculation
         super().__init__()
 
     def compose(self) -> ComposeResult:
@@ -114,21 +189,28 @@ class BillSplitterApp(App):
         yield Footer()
 
     def on_mount(self) -> None:
+        self._results_widget = self.query_one("#results", Static)
+        self._people_list = self.query_one("#people_list")
         try:
             self.all_people = logic.load_people_from_file("people.json")
+            # Drop duplicates while keeping the order from people.json
+            self._all_people_ordered = list(dict.fromkeys(self.all_people))
         except FileNotFoundError:
-            self.query_one("#results").update(
-                "[bold red]Error: people.json not found.[/bold red]"
-            )
+            self._show_status("[bold red]Error: people.json not found.[/bold red]")
         except json.JSONDecodeError:
-            self.query_one("#results").update(
+            self._show_status(
                 "[bold red]Error: Could not decode people.json.[/bold red]"
             )
 
-    def _safe_eval_with_notify(self, expression: str) -> Decimal:
-        """UI-aware wrapper for safe_decimal_eval that notifies on error."""
+    def _show_status(self, message: str) -> None:
+        """Shows a non-result message, so there is no calculation left to share."""
+        self._results_widget.update(message)
+        self._last_plain_result = ""
+
+    def _safe_eval_with_notify(self, evaluate: Callable[[], Decimal]) -> Decimal:
+        """UI-aware wrapper for an evaluation that notifies on error and uses 0."""
         try:
-            return logic.safe_decimal_eval(expression)
+            return evaluate()
         except logic.CalculationError:
             self.notify("⚠️ Invalid expression, using 0 instead.", severity="error")
             return Decimal(0)
@@ -144,140 +226,185 @@ class BillSplitterApp(App):
             self.action_upload_image()
 
     def action_add_person(self) -> None:
-        current_people = {inp.border_title for inp in self.query(PersonInput)}
-        available_people = [p for p in self.all_people if p not in current_people]
+        available_people = [
+            p for p in self._all_people_ordered if p not in self._present
+        ]
 
         if not available_people:
-            self.query_one("#results").update(
+            self._show_status(
                 "[bold yellow]All people from people.json have been added.[/bold yellow]"
             )
             return
 
         def add_people_callback(people_names: list[str]) -> None:
             if people_names:
-                people_list = self.query_one("#people_list")
-                last_input = None
-                for name in people_names:
-                    person_widget = PersonInput(name=name)
-                    people_list.mount(person_widget)
-                    last_input = person_widget
-                if last_input:
-                    last_input.focus_input()
+                widgets = [PersonInput(name=name) for name in people_names]
+                # Mount as one batch so the list is laid out once
+                self._people_list.mount_all(widgets)
+                self._person_widgets.extend(widgets)
+                self._present.update(people_names)
+                # The shown result no longer covers everyone in the list
+                self._last_plain_result = ""
+                widgets[-1].focus_input()
 
         self.push_screen(SelectPersonScreen(available_people), add_people_callback)
 
     def on_person_input_remove(self, message: PersonInput.Remove) -> None:
+        if message.to_remove not in self._person_widgets:
+            return  # Already removed by an earlier message
+        self._person_widgets.remove(message.to_remove)
+        self._present.discard(message.to_remove.person_name)
         message.to_remove.remove()
-        self.query_one("#results").update("Person removed.")
+        self._show_status("Person removed.")
 
     def calculate_split(self) -> None:
-        results_widget = self.query_one("#results")
+        results_widget = self._results_widget
         try:
             # 1. Gather data from UI widgets
-            person_widgets = self.query(PersonInput)
             person_amounts = [
-                (w.border_title, self._safe_eval_with_notify(w.value))
-                for w in person_widgets
+                (w.person_name, self._safe_eval_with_notify(w.evaluate))
+                for w in self._person_widgets
             ]
             other_charges_input = self.query_one("#other_charges", Input)
-            other_charges = self._safe_eval_with_notify(other_charges_input.value)
+            other_charges = self._safe_eval_with_notify(
+                partial(logic.safe_decimal_eval, other_charges_input.value)
+            )
 
             # 2. Call the business logic function
             result = logic.calculate_split_bill(person_amounts, other_charges)
 
             # 3. Format and display the result from the logic function
             if not result:
-                results_widget.update("Nothing to calculate.")
+                self._show_status("Nothing to calculate.")
                 return
 
+            # Round each amount to cents once; str() of the result needs no format spec
+            subtotal = result["subtotal"].quantize(_CENTS, rounding=ROUND_HALF_UP)
+            grand_total = result["grand_total"].quantize(_CENTS, rounding=ROUND_HALF_UP)
             if result.get("is_equal_split"):
-                output = (
-                    f"[bold]Total: {result['grand_total']:.2f}[/bold]\n\n"
+                header = (
+                    f"[bold]Total: {grand_total}[/bold]\n\n"
                     f"[bold]Final amounts (charges split equally):[/bold]\n"
                 )
-                for name, amount in result["final_amounts"]:
-                    output += f"{name}: {amount:.2f}\n"
             else:
-                output = (
-                    f"[bold]Subtotal: {result['subtotal']:.2f}\n"
-                    f"Grand Total: {result['grand_total']:.2f}[/bold]\n\n"
+                header = (
+                    f"[bold]Subtotal: {subtotal}\n"
+                    f"Grand Total: {grand_total}[/bold]\n\n"
                     f"[bold]Final amounts per person:[/bold]\n"
                 )
-                for name, amount in result["final_amounts"]:
-                    output += f"{name}: {amount:.2f}\n"
+            lines = [
+                f"{name}: {amount.quantize(_CENTS, rounding=ROUND_HALF_UP)}"
+                for name, amount in result["final_amounts"]
+            ]
+            output = header + "\n".join(lines)
 
             results_widget.update(output)
+            self._last_plain_result = Text.from_markup(output).plain
 
         except InvalidOperation:
-            results_widget.update(
+            self._show_status(
                 "[bold red]Error: Invalid number or expression.[/bold red]"
             )
 
     def action_share_results(self) -> None:
-        """Shares the content of the results widget using termux-share."""
-        results_widget = self.query_one("#results", Static)
-        share_text = results_widget.renderable
-        if share_text:
-            try:
-                # Convert Textual Renderable to plain text for sharing
-                plain_text = str(share_text).replace("[bold]", "").replace("[/bold]", "")
-
-                # Use subprocess to run the termux-share command
-                subprocess.run(["termux-share", "-a", "send"], input=plain_text.encode(), check=True)
-                self.notify("Results shared successfully!")
-            except FileNotFoundError:
-                self.notify(
-                    "Error: 'termux-share' command not found. Are you in Termux?",
-                    severity="error",
-                )
-            except subprocess.CalledProcessError as e:
-                self.notify(f"Error sharing: {e}", severity="error")
-            except Exception as e:
-                self.notify(f"An unexpected error occurred: {e}", severity="error")
+        """Shares the last calculated result using termux-share."""
+        if self._last_plain_result:
+            self.run_worker(
+                partial(self._share_worker, self._last_plain_result),
+                name="share",
+                thread=True,
+            )
         else:
             self.notify("Nothing to share yet. Calculate the bill first!", severity="warning")
 
-    def action_upload_image(self) -> None:
-        """Handles uploading, preprocessing, performing OCR, and displaying the bill image."""
+    def _share_worker(self, plain_text: str) -> None:
+        """Runs termux-share off the UI thread and reports the outcome."""
+        import subprocess  # Only needed when sharing
+
         try:
-            # Open a file dialog to select an image
-            app = QApplication([])  # Create a QApplication instance
-            file_path, _ = QFileDialog.getOpenFileName(
-                None,
-                "Select Bill Image",
-                "",
-                "Image Files (*.png *.jpg *.jpeg *.bmp *.gif)"
+            # Use subprocess to run the termux-share command
+            subprocess.run(["termux-share", "-a", "send"], input=plain_text.encode(), check=True)
+            self.call_from_thread(self.notify, "Results shared successfully!")
+        except FileNotFoundError:
+            self.call_from_thread(
+                self.notify,
+                "Error: 'termux-share' command not found. Are you in Termux?",
+                severity="error",
             )
-            app.quit()  # Close the QApplication instance
+        except subprocess.CalledProcessError as e:
+            self.call_from_thread(self.notify, f"Error sharing: {e}", severity="error")
+        except Exception as e:
+            self.call_from_thread(
+                self.notify, f"An unexpected error occurred: {e}", severity="error"
+            )
+
+    def action_upload_image(self) -> None:
+        """Asks for a bill image and starts OCR on it in a worker thread."""
 
+        def upload_image_callback(file_path: str | None) -> None:
             if not file_path:  # If no file is selected
                 self.notify("No file selected.", severity="warning")
                 return
 
+            self.run_worker(
+                partial(self._ocr_worker, file_path),
+                name="ocr",
+                group="ocr",
+                thread=True,
+                exclusive=True,
+            )
+
+        self.push_screen(SelectImageScreen(), upload_image_callback)
+
+    def _ocr_worker(self, file_path: str) -> None:
+        """Preprocesses the image and runs OCR; executes off the UI thread."""
+        # Threads can't be stopped, so a superseded worker just skips reporting
+        worker = get_current_worker()
+        try:
+            # Heavy OCR dependencies are imported on first use to keep startup fast
+            import cv2  # OpenCV for advanced image preprocessing
+            import pytesseract  # For OCR
+
             image = cv2.imread(file_path, cv2.IMREAD_GRAYSCALE)
+            if image is None:
+                raise ValueError(f"Could not read image: {file_path}")
 
             # Preprocess the image
-            # 1. Apply thresholding to make text stand out
-            _, image = cv2.threshold(image, 128, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
-
-            # 2. Apply dilation to connect broken text
-            kernel = np.ones((2, 2), np.uint8)
-            image = cv2.dilate(image, kernel, iterations=1)
+            # 1. Downscale large photos; OCR time grows with pixel count and
+            #    receipts stay legible well below typical phone-camera sizes
+            height, width = image.shape
+            scale = min(1.0, OCR_MAX_LONG_EDGE / max(height, width))
+            if scale < 1.0:
+                image = cv2.resize(
+                    image,
+                    (round(width * scale), round(height * scale)),
+                    interpolation=cv2.INTER_AREA,
+                )
 
-            image = cv2.resize(image, (image.shape[1] * 2, image.shape[0] * 2), interpolation=cv2.INTER_LINEAR)
+            # 2. Apply thresholding to make text stand out
+            _, image = cv2.threshold(image, 128, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
 
-            # Perform OCR with table recognition mode
-            config = "--psm 6"  # Assume a single uniform block of text
+            # Perform OCR with the LSTM engine and table recognition mode
+            config = "--oem 1 --psm 6"  # Assume a single uniform block of text
             extracted_text = pytesseract.image_to_string(image, config=config)
-
-            # Update the UI with the extracted text (if required for debugging)
-            # self.query_one("#uploaded_image_preview", Static).update(
-            #     f"[bold]Uploaded Image:[/bold]\n{file_path}\n\n"
-            #     f"[bold]Extracted Text:[/bold]\n{extracted_text}"
-            # )
-            self.notify("Image uploaded and OCR completed successfully!", severity="success")
         except Exception as e:
-            self.notify(f"Error uploading or processing image: {e}", severity="error")
+            if not worker.is_cancelled:
+                self.call_from_thread(
+                    self.notify, f"Error uploading or processing image: {e}", severity="error"
+                )
+            return
+
+        if not worker.is_cancelled:
+            self.call_from_thread(self._on_ocr_done, file_path, extracted_text)
+
+    def _on_ocr_done(self, file_path: str, extracted_text: str) -> None:
+        """Updates the UI once the OCR worker has finished."""
+        # Update the UI with the extracted text (if required for debugging)
+        # self.query_one("#uploaded_image_preview", Static).update(
+        #     f"[bold]Uploaded Image:[/bold]\n{file_path}\n\n"
+        #     f"[bold]Extracted Text:[/bold]\n{extracted_text}"
+        # )
+        self.notify("Image uploaded and OCR completed successfully!", severity="success")
 
     def action_toggle_dark(self) -> None:
         self.dark = not self.dark